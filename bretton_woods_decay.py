@@ -22,13 +22,29 @@ Sends a formatted email report via iCloud SMTP.
 Developed with assistance from Claude Code
 """
 
+import json
+import operator
 import os
 import re
 import requests
-from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from html import escape
+from email.message import EmailMessage
 import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import compress
+
+try:
+    # orjson decodes the large Yahoo/DBnomics payloads several times faster;
+    # it's optional and the stdlib decoder is used when it isn't installed.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 # =============================================================================
 # CONFIGURATION
@@ -43,6 +59,52 @@ HEADERS = {
     "Accept": "application/json"
 }
 
+# Yahoo Finance rejects non-browser user agents
+YAHOO_HEADERS = {**HEADERS, "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Shared session so repeat calls to the same host (FRED, Yahoo) reuse a
+# keep-alive connection instead of paying a fresh TCP+TLS handshake each time.
+# Rate limits and transient 5xx are retried with backoff; once retries run out
+# the last response is returned so the fetchers' status_code checks still apply.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False
+    )
+))
+
+# Per-source request timeouts (seconds), sized to how each endpoint behaves:
+# IMF and Treasury can be slow to respond, FRED and Yahoo normally answer fast
+# and a hung connection there should fail over to a retry sooner.
+TIMEOUTS = {
+    "dbnomics": 30,
+    "imf": 45,
+    "treasury": 45,
+    "fred": 20,
+    "yahoo": 10,
+}
+
+# Optional on-disk cache of fetch results, for development re-runs. Disabled
+# unless BRETTON_WOODS_CACHE_DIR is set. TTLs (seconds, by INDICATORS key)
+# follow how often each source actually updates.
+CACHE_DIR = os.environ.get("BRETTON_WOODS_CACHE_DIR")
+CACHE_TTL = {
+    "cofer": 24 * 3600,               # IMF COFER: quarterly
+    "treasury": 12 * 3600,            # TIC: monthly
+    "dxy": 15 * 60,                   # Yahoo: intraday
+    "debt_to_gdp": 6 * 3600,          # FRED
+    "interest_to_revenue": 6 * 3600,
+    "interest_to_defense": 6 * 3600,
+    "trade_balance_gdp": 6 * 3600,
+    "intl_vs_us": 15 * 60,
+}
+
 # Thresholds: (warning, critical, direction)
 # direction: "below" means warning if value drops below threshold
 #            "above" means warning if value rises above threshold
@@ -117,6 +179,16 @@ THRESHOLDS = {
 # DATA FETCHING FUNCTIONS
 # =============================================================================
 
+def round_or_none(value, ndigits):
+    """round() that passes None through (and keeps a genuine 0.0)."""
+    return None if value is None else round(value, ndigits)
+
+
+def last_valid_index(values):
+    """Index of the last non-null entry in values, or -1 if there is none."""
+    return next((i for i in range(len(values) - 1, -1, -1) if values[i] is not None), -1)
+
+
 def fetch_imf_cofer():
     """
     Fetch USD share of global reserves from DBnomics (mirrors IMF COFER).
@@ -125,10 +197,10 @@ def fetch_imf_cofer():
     try:
         # DBnomics API for IMF COFER - USD share of allocated reserves (quarterly)
         url = "https://api.db.nomics.world/v22/series/IMF/COFER/Q.W00.RAXGFXARUSDRT_PT?observations=1"
-        response = requests.get(url, headers=HEADERS, timeout=30)
+        response = SESSION.get(url, timeout=TIMEOUTS["dbnomics"])
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             series = data.get("series", {})
             docs = series.get("docs", [])
             
@@ -151,9 +223,7 @@ def fetch_imf_cofer():
                 
                 if periods and values:
                     # Get latest non-null value
-                    latest_idx = len(values) - 1
-                    while latest_idx >= 0 and values[latest_idx] is None:
-                        latest_idx -= 1
+                    latest_idx = last_valid_index(values)
                     
                     if latest_idx >= 0:
                         current = float(values[latest_idx])
@@ -177,9 +247,9 @@ def fetch_imf_cofer():
                             "success": True,
                             "value": round(current, 1),
                             "period": period,
-                            "year_ago": round(year_ago, 1) if year_ago else None,
+                            "year_ago": round_or_none(year_ago, 1),
                             "year_ago_period": year_ago_period,
-                            "five_year_ago": round(five_year_ago, 1) if five_year_ago else None,
+                            "five_year_ago": round_or_none(five_year_ago, 1),
                             "five_year_period": five_year_period,
                             "change_1y": round(current - year_ago, 2) if year_ago else None,
                             "change_5y": round(current - five_year_ago, 2) if five_year_ago else None,
@@ -197,11 +267,14 @@ def fetch_imf_cofer():
 def fetch_imf_cofer_direct():
     """Fallback: try direct IMF API."""
     try:
-        url = "https://dataservices.imf.org/REST/SDMX_JSON.svc/CompactData/COFER/Q.W00.RAXGFXARUSDRT_PT"
-        response = requests.get(url, headers=HEADERS, timeout=30)
+        # Only the 21 quarters behind the five-year change are read, so ask
+        # for about seven years (covering the release lag) not the full history
+        start_year = date.today().year - 7
+        url = f"https://dataservices.imf.org/REST/SDMX_JSON.svc/CompactData/COFER/Q.W00.RAXGFXARUSDRT_PT?startPeriod={start_year}"
+        response = SESSION.get(url, timeout=TIMEOUTS["imf"])
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             series = data.get("CompactData", {}).get("DataSet", {}).get("Series", {})
             observations = series.get("Obs", [])
             
@@ -220,8 +293,8 @@ def fetch_imf_cofer_direct():
                     "success": True,
                     "value": round(current, 1),
                     "period": period,
-                    "year_ago": round(year_ago, 1) if year_ago else None,
-                    "five_year_ago": round(five_year_ago, 1) if five_year_ago else None,
+                    "year_ago": round_or_none(year_ago, 1),
+                    "five_year_ago": round_or_none(five_year_ago, 1),
                     "change_1y": round(current - year_ago, 2) if year_ago else None,
                     "change_5y": round(current - five_year_ago, 2) if five_year_ago else None,
                     "data_freshness": "Live from IMF",
@@ -233,6 +306,32 @@ def fetch_imf_cofer_direct():
         return {"success": False, "error": str(e), "source": "IMF COFER"}
 
 
+# Title, unit and footnote lines in slt_table5.txt that carry no data
+_TIC_SKIP_RE = re.compile(
+    r"(?:Table 5:|Holdings at|Billions|Link:|Notes:|The data in|overseas|\(see TIC"
+    r"|Estimated|International|as reported|and on TIC)"
+)
+
+# Country rows we track in slt_table5.txt -> key in the result
+_TIC_HOLDERS = {"japan": "japan", "china, mainland": "china"}
+
+
+def parse_tic_row(parts):
+    """
+    Parse the holdings columns of a split TIC row, newest first.
+    Blank cells are dropped; cells that aren't numbers (e.g. "n.a.") become None.
+    """
+    values = []
+    for p in parts[1:]:
+        p = p.strip()
+        if p:
+            try:
+                values.append(float(p.replace(',', '')))
+            except ValueError:
+                values.append(None)
+    return values
+
+
 def fetch_treasury_holdings():
     """
     Fetch China and Japan Treasury holdings from Treasury TIC data.
@@ -242,134 +341,140 @@ def fetch_treasury_holdings():
     try:
         # Use the newer SLT table 5 file (updated monthly)
         url = "https://ticdata.treasury.gov/resource-center/data-chart-center/tic/Documents/slt_table5.txt"
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        
-        if response.status_code == 200:
-            lines = response.text.strip().split('\n')
-            
-            china_data = None
-            japan_data = None
-            data_date = None
-            date_columns = []
-            
-            for line in lines:
-                # Skip empty lines and notes
-                if not line.strip():
-                    continue
-                if line.startswith('Table 5:') or line.startswith('Holdings at') or line.startswith('Billions') or line.startswith('Link:'):
-                    continue
-                if line.startswith('Notes:') or line.startswith('The data in') or line.startswith('overseas') or line.startswith('(see TIC'):
-                    continue
-                if line.startswith('Estimated') or line.startswith('International') or line.startswith('as reported') or line.startswith('and on TIC'):
-                    continue
-                
-                # Tab-separated data
-                parts = line.split('\t')
+        # Stream the file line by line rather than holding the whole body
+        # and a split copy of it in memory
+        with SESSION.get(url, timeout=TIMEOUTS["treasury"], stream=True) as response:
+            if response.status_code == 200:
+                holders = {}
+                data_date = None
+                date_columns = []
                 
-                # Header row with dates (Country, 2025-09, 2025-08, ...)
-                if parts[0].strip() == 'Country':
-                    date_columns = [p.strip() for p in parts[1:] if p.strip()]
-                    if date_columns:
-                        data_date = date_columns[0]  # Most recent date
-                    continue
+                # iter_lines only decodes when the response has an encoding,
+                # which requests leaves unset for non-text Content-Types
+                response.encoding = response.encoding or "latin-1"
+                for line in response.iter_lines(decode_unicode=True):
+                    # Skip empty lines and notes
+                    if not line.strip() or _TIC_SKIP_RE.match(line):
+                        continue
+                    
+                    # Tab-separated data
+                    parts = line.split('\t')
+                    
+                    # Header row with dates (Country, 2025-09, 2025-08, ...)
+                    if parts[0].strip() == 'Country':
+                        date_columns = [p.strip() for p in parts[1:] if p.strip()]
+                        if date_columns:
+                            data_date = date_columns[0]  # Most recent date
+                        continue
+                    
+                    # Parse country rows
+                    country = parts[0].strip().lower()
+                    
+                    holder = _TIC_HOLDERS.get(country)
+                    if holder:
+                        values = parse_tic_row(parts)
+                        if values and values[0] is not None:
+                            holders[holder] = {
+                                "current": values[0],
+                                "6mo_ago": values[6] if len(values) > 6 and values[6] is not None else None,
+                                "12mo_ago": values[12] if len(values) > 12 and values[12] is not None else None
+                            }
+                        # Both holders sit near the top; the rest of the file
+                        # (other countries, footnotes) needn't be downloaded
+                        if date_columns and len(holders) == len(_TIC_HOLDERS):
+                            break
                 
-                # Parse country rows
-                country = parts[0].strip().lower()
+                result = {
+                    "success": True, 
+                    "data_date": data_date,
+                    "data_freshness": data_date if data_date else "Unknown",
+                    "source": "Treasury TIC SLT Table 5"
+                }
                 
-                if country == 'japan':
-                    values = []
-                    for p in parts[1:]:
-                        p = p.strip()
-                        if p:
-                            try:
-                                values.append(float(p.replace(',', '')))
-                            except ValueError:
-                                values.append(None)
-                    
-                    if values and values[0] is not None:
-                        japan_data = {
-                            "current": values[0],
-                            "6mo_ago": values[6] if len(values) > 6 and values[6] is not None else None,
-                            "12mo_ago": values[12] if len(values) > 12 and values[12] is not None else None
-                        }
+                for key, holder_data in holders.items():
+                    holder_data["change_6mo"] = round(holder_data["current"] - holder_data["6mo_ago"], 1) if holder_data["6mo_ago"] else None
+                    holder_data["change_12mo"] = round(holder_data["current"] - holder_data["12mo_ago"], 1) if holder_data["12mo_ago"] else None
+                    holder_data["data_freshness"] = result["data_freshness"]
+                    holder_data["source"] = "Treasury TIC SLT Table 5"
+                    result[key] = holder_data
                 
-                if country == 'china, mainland':
-                    values = []
-                    for p in parts[1:]:
-                        p = p.strip()
-                        if p:
-                            try:
-                                values.append(float(p.replace(',', '')))
-                            except ValueError:
-                                values.append(None)
-                    
-                    if values and values[0] is not None:
-                        china_data = {
-                            "current": values[0],
-                            "6mo_ago": values[6] if len(values) > 6 and values[6] is not None else None,
-                            "12mo_ago": values[12] if len(values) > 12 and values[12] is not None else None
-                        }
-            
-            result = {
-                "success": True, 
-                "data_date": data_date,
-                "data_freshness": data_date if data_date else "Unknown",
-                "source": "Treasury TIC SLT Table 5"
-            }
-            
-            if china_data:
-                china_data["change_6mo"] = round(china_data["current"] - china_data["6mo_ago"], 1) if china_data["6mo_ago"] else None
-                china_data["change_12mo"] = round(china_data["current"] - china_data["12mo_ago"], 1) if china_data["12mo_ago"] else None
-                china_data["data_freshness"] = data_date
-                china_data["source"] = "Treasury TIC SLT Table 5"
-                result["china"] = china_data
-            
-            if japan_data:
-                japan_data["change_6mo"] = round(japan_data["current"] - japan_data["6mo_ago"], 1) if japan_data["6mo_ago"] else None
-                japan_data["change_12mo"] = round(japan_data["current"] - japan_data["12mo_ago"], 1) if japan_data["12mo_ago"] else None
-                japan_data["data_freshness"] = data_date
-                japan_data["source"] = "Treasury TIC SLT Table 5"
-                result["japan"] = japan_data
-            
-            return result
+                return result
         
         return {"success": False, "error": f"API returned status {response.status_code}", "source": "Treasury TIC"}
     except Exception as e:
         return {"success": False, "error": str(e), "source": "Treasury TIC"}
 
 
-def fetch_fred_series(series_id, name):
+def fred_csv_url(series_id, years=None):
+    """
+    fredgraph.csv URL for a series. With years, FRED only returns observations
+    from that far back (cosd) instead of the series' full multi-decade history.
+    """
+    url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+    if years:
+        start = date.today() - timedelta(days=round(365.25 * years))
+        url += f"&cosd={start.isoformat()}"
+    return url
+
+
+def fetch_fred_series(series_id, name, years=None):
     """Fetch a data series from FRED (no API key needed for basic CSV access)."""
     try:
-        url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
-        response = requests.get(url, headers=HEADERS, timeout=30)
+        url = fred_csv_url(series_id, years)
+        response = SESSION.get(url, timeout=TIMEOUTS["fred"])
         
         if response.status_code == 200:
-            lines = response.text.strip().split('\n')
-            if len(lines) > 1:
-                # Get latest value (last non-empty line)
-                for line in reversed(lines[1:]):
-                    parts = line.split(',')
-                    if len(parts) >= 2 and parts[1].strip() and parts[1] != '.':
-                        date = parts[0]
-                        value = float(parts[1])
-                        return {
-                            "success": True,
-                            "value": value,
-                            "date": date,
-                            "data_freshness": date,
-                            "source": f"FRED ({series_id})",
-                            "name": name
-                        }
+            # Scan the raw bytes backwards for the latest non-missing row; the
+            # body is never decoded as a whole, only the matching line is
+            body = response.content.rstrip()
+            header_end = body.find(b'\n')
+            end = len(body)
+            while end > header_end >= 0:
+                start = body.rfind(b'\n', header_end, end)
+                parts = body[start + 1:end].strip().split(b',', 1)
+                end = start
+                if len(parts) == 2 and parts[1] and parts[1] != b'.':
+                    obs_date = parts[0].decode('ascii')
+                    value = float(parts[1])
+                    return {
+                        "success": True,
+                        "value": value,
+                        "date": obs_date,
+                        "data_freshness": obs_date,
+                        "source": f"FRED ({series_id})",
+                        "name": name
+                    }
         
         return {"success": False, "error": f"Could not fetch {name}", "source": f"FRED ({series_id})", "name": name}
     except Exception as e:
         return {"success": False, "error": str(e), "source": f"FRED ({series_id})", "name": name}
 
 
+def parse_fred_csv(text):
+    """All (date, value) observations in a fredgraph.csv body, oldest first, skipping missing ones."""
+    lines = text.strip().split('\n')
+    values = []
+    for i in range(1, len(lines)):
+        parts = lines[i].split(',', 2)
+        if len(parts) >= 2 and parts[1].strip() and parts[1] != '.':
+            values.append((parts[0], float(parts[1])))
+    return values
+
+
+def fetch_fred_csvs(*series_ids, years=None):
+    """
+    Download several FRED CSVs concurrently over the shared session, for the
+    ratio indicators that need two independent series. Returns the responses
+    in the order the series were given.
+    """
+    urls = [fred_csv_url(series_id, years) for series_id in series_ids]
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        return list(executor.map(lambda url: SESSION.get(url, timeout=TIMEOUTS["fred"]), urls))
+
+
 def fetch_debt_to_gdp():
     """Fetch US Federal Debt to GDP ratio from FRED."""
-    result = fetch_fred_series("GFDEGDQ188S", "Debt-to-GDP")
+    result = fetch_fred_series("GFDEGDQ188S", "Debt-to-GDP", years=2)
     if result.get("success"):
         result["value"] = round(result["value"], 1)
     return result
@@ -383,26 +488,13 @@ def fetch_interest_to_revenue():
     This matches Treasury's reported ~19% figure for FY2025.
     """
     try:
-        # OMB fiscal year data (annual, updated each fiscal year)
-        interest_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=FYOINT"
-        revenue_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=FYFR"
-        
-        interest_resp = requests.get(interest_url, headers=HEADERS, timeout=30)
-        revenue_resp = requests.get(revenue_url, headers=HEADERS, timeout=30)
+        # OMB fiscal year data (annual, updated each fiscal year); the 5-year
+        # comparison needs 6 observations, plus up to a year of release lag
+        interest_resp, revenue_resp = fetch_fred_csvs("FYOINT", "FYFR", years=10)
         
         if interest_resp.status_code == 200 and revenue_resp.status_code == 200:
-            def get_values(text):
-                """Get all values as list of (date, value) tuples."""
-                lines = text.strip().split('\n')
-                values = []
-                for line in lines[1:]:
-                    parts = line.split(',')
-                    if len(parts) >= 2 and parts[1].strip() and parts[1] != '.':
-                        values.append((parts[0], float(parts[1])))
-                return values
-            
-            interest_vals = get_values(interest_resp.text)
-            revenue_vals = get_values(revenue_resp.text)
+            interest_vals = parse_fred_csv(interest_resp.text)
+            revenue_vals = parse_fred_csv(revenue_resp.text)
             
             if interest_vals and revenue_vals:
                 # Get latest values
@@ -430,8 +522,8 @@ def fetch_interest_to_revenue():
                     "date": interest_date,
                     "data_freshness": f"FY {interest_date[:4]}",
                     "source": "FRED (FYOINT / FYFR)",
-                    "year_ago": round(year_ago_ratio, 1) if year_ago_ratio else None,
-                    "five_year_ago": round(five_year_ratio, 1) if five_year_ratio else None,
+                    "year_ago": round_or_none(year_ago_ratio, 1),
+                    "five_year_ago": round_or_none(five_year_ratio, 1),
                     "change_1y": round(ratio - year_ago_ratio, 1) if year_ago_ratio else None,
                     "change_5y": round(ratio - five_year_ratio, 1) if five_year_ratio else None
                 }
@@ -440,37 +532,62 @@ def fetch_interest_to_revenue():
     except Exception as e:
         return {"success": False, "error": str(e), "source": "FRED"}
 
+def yahoo_chart_url(symbol):
+    """
+    Weekly Yahoo Finance chart URL covering just over three years: the 156
+    bars the 3-year comparison reaches back, plus a quarter of slack for
+    weeks with no close.
+    """
+    period2 = int(time.time())
+    period1 = period2 - (156 + 13) * 7 * 86400
+    return f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1wk&period1={period1}&period2={period2}"
+
+
+@lru_cache(maxsize=1024)
+def _ts_to_date(ts):
+    """Format a Unix timestamp as a UTC YYYY-MM-DD date."""
+    g = time.gmtime(ts)
+    return f"{g.tm_year:04d}-{g.tm_mon:02d}-{g.tm_mday:02d}"
+
+
+def chart_closes(data):
+    """
+    Pull (timestamps, closes, as_of) out of a Yahoo Finance chart response,
+    dropping the points where the close is missing. Weekly bars are stamped
+    with the start of their week, so as_of is the last market time from the
+    chart meta (falling back to the last bar).
+    """
+    result = data.get("chart", {}).get("result", [{}])[0]
+    closes = result.get("indicators", {}).get("quote", [{}])[0].get("close", [])
+    keep = [c is not None for c in closes]
+    timestamps = list(compress(result.get("timestamp", []), keep))
+    as_of = result.get("meta", {}).get("regularMarketTime") or (timestamps[-1] if timestamps else None)
+    return timestamps, list(compress(closes, keep)), as_of
+
+
 def fetch_dxy():
     """
     Fetch DXY Dollar Index from Yahoo Finance.
     DXY measures USD against a basket of 6 currencies.
     """
     try:
-        url = "https://query1.finance.yahoo.com/v8/finance/chart/DX-Y.NYB?interval=1d&range=5y"
-        headers = {**HEADERS, "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        response = requests.get(url, headers=headers, timeout=30)
+        url = yahoo_chart_url("DX-Y.NYB")
+        response = SESSION.get(url, headers=YAHOO_HEADERS, timeout=TIMEOUTS["yahoo"])
         
         if response.status_code == 200:
-            data = response.json()
-            result = data.get("chart", {}).get("result", [{}])[0]
+            timestamps, closes, as_of = chart_closes(json_loads(response.content))
             
-            closes = result.get("indicators", {}).get("quote", [{}])[0].get("close", [])
-            timestamps = result.get("timestamp", [])
-            
-            # Filter out None values
-            valid_data = [(t, c) for t, c in zip(timestamps, closes) if c is not None]
-            
-            if valid_data:
-                latest_ts, current = valid_data[-1]
-                latest_date = datetime.fromtimestamp(latest_ts).strftime("%Y-%m-%d")
+            if closes:
+                current = closes[-1]
+                latest_date = _ts_to_date(as_of)
                 
-                # Get 1 year ago (roughly 252 trading days)
-                year_ago = valid_data[-252][1] if len(valid_data) > 252 else None
-                year_ago_date = datetime.fromtimestamp(valid_data[-252][0]).strftime("%Y-%m-%d") if len(valid_data) > 252 else None
+                # Get 1 year ago (52 weekly bars)
+                year_ago = closes[-52] if len(closes) > 52 else None
+                year_ago_date = _ts_to_date(timestamps[-52]) if len(closes) > 52 else None
                 
                 # Get 3 years ago
-                three_year_ago = valid_data[-756][1] if len(valid_data) > 756 else None
-                three_year_date = datetime.fromtimestamp(valid_data[-756][0]).strftime("%Y-%m-%d") if len(valid_data) > 756 else None
+                three_year_ago = closes[-156] if len(closes) > 156 else None
+                three_year_date = _ts_to_date(timestamps[-156]) if len(closes) > 156 else None
                 
                 # Calculate percentage changes
                 change_1y_pct = ((current - year_ago) / year_ago * 100) if year_ago else None
@@ -481,12 +598,12 @@ def fetch_dxy():
                     "value": round(current, 2),
                     "date": latest_date,
                     "data_freshness": f"Live (as of {latest_date})",
-                    "year_ago": round(year_ago, 2) if year_ago else None,
+                    "year_ago": round_or_none(year_ago, 2),
                     "year_ago_date": year_ago_date,
-                    "three_year_ago": round(three_year_ago, 2) if three_year_ago else None,
+                    "three_year_ago": round_or_none(three_year_ago, 2),
                     "three_year_date": three_year_date,
-                    "change_1y": round(change_1y_pct, 1) if change_1y_pct else None,
-                    "change_3y": round(change_3y_pct, 1) if change_3y_pct else None,
+                    "change_1y": round_or_none(change_1y_pct, 1),
+                    "change_3y": round_or_none(change_3y_pct, 1),
                     "source": "Yahoo Finance (DX-Y.NYB)"
                 }
         
@@ -505,35 +622,29 @@ def fetch_intl_vs_us_performance():
     """
     try:
         def get_prices(symbol):
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=5y"
-            headers = {**HEADERS, "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-            response = requests.get(url, headers=headers, timeout=30)
+            url = yahoo_chart_url(symbol)
+            response = SESSION.get(url, headers=YAHOO_HEADERS, timeout=TIMEOUTS["yahoo"])
             
             if response.status_code == 200:
-                data = response.json()
-                result = data.get("chart", {}).get("result", [{}])[0]
-                closes = result.get("indicators", {}).get("quote", [{}])[0].get("close", [])
-                timestamps = result.get("timestamp", [])
-                
-                valid = [(t, c) for t, c in zip(timestamps, closes) if c is not None]
-                return valid
-            return []
+                return chart_closes(json_loads(response.content))
+            return [], [], None
         
-        vxus_data = get_prices("VXUS")
-        vti_data = get_prices("VTI")
+        # Independent requests to the same host: fetch both over the pooled session at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            (_, vxus_data, vxus_as_of), (_, vti_data, _) = executor.map(get_prices, ["VXUS", "VTI"])
         
         if vxus_data and vti_data:
-            vxus_current = vxus_data[-1][1]
-            vti_current = vti_data[-1][1]
-            latest_date = datetime.fromtimestamp(vxus_data[-1][0]).strftime("%Y-%m-%d")
+            vxus_current = vxus_data[-1]
+            vti_current = vti_data[-1]
+            latest_date = _ts_to_date(vxus_as_of)
             
-            # 1 year ago
-            vxus_1y = vxus_data[-252][1] if len(vxus_data) > 252 else None
-            vti_1y = vti_data[-252][1] if len(vti_data) > 252 else None
+            # 1 year ago (52 weekly bars)
+            vxus_1y = vxus_data[-52] if len(vxus_data) > 52 else None
+            vti_1y = vti_data[-52] if len(vti_data) > 52 else None
             
             # 3 years ago
-            vxus_3y = vxus_data[-756][1] if len(vxus_data) > 756 else None
-            vti_3y = vti_data[-756][1] if len(vti_data) > 756 else None
+            vxus_3y = vxus_data[-156] if len(vxus_data) > 156 else None
+            vti_3y = vti_data[-156] if len(vti_data) > 156 else None
             
             result = {
                 "success": True,
@@ -571,24 +682,12 @@ def fetch_interest_to_defense():
     FDEFX = National defense consumption & investment (quarterly SAAR, billions)
     """
     try:
-        interest_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=A091RC1Q027SBEA"
-        defense_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=FDEFX"
-        
-        interest_resp = requests.get(interest_url, headers=HEADERS, timeout=30)
-        defense_resp = requests.get(defense_url, headers=HEADERS, timeout=30)
+        # Quarterly: the year-ago ratio needs 5 observations
+        interest_resp, defense_resp = fetch_fred_csvs("A091RC1Q027SBEA", "FDEFX", years=3)
         
         if interest_resp.status_code == 200 and defense_resp.status_code == 200:
-            def get_values(text):
-                lines = text.strip().split('\n')
-                values = []
-                for line in lines[1:]:
-                    parts = line.split(',')
-                    if len(parts) >= 2 and parts[1].strip() and parts[1] != '.':
-                        values.append((parts[0], float(parts[1])))
-                return values
-            
-            interest_vals = get_values(interest_resp.text)
-            defense_vals = get_values(defense_resp.text)
+            interest_vals = parse_fred_csv(interest_resp.text)
+            defense_vals = parse_fred_csv(defense_resp.text)
             
             if interest_vals and defense_vals:
                 interest_date, interest = interest_vals[-1]
@@ -608,7 +707,7 @@ def fetch_interest_to_defense():
                     "date": interest_date,
                     "data_freshness": interest_date,
                     "source": "FRED (A091RC1Q027SBEA / FDEFX)",
-                    "year_ago": round(year_ago_ratio, 1) if year_ago_ratio else None,
+                    "year_ago": round_or_none(year_ago_ratio, 1),
                     "change_1y": round(ratio - year_ago_ratio, 1) if year_ago_ratio else None
                 }
         
@@ -624,24 +723,12 @@ def fetch_trade_balance_gdp():
     GDP = Gross Domestic Product (quarterly, billions)
     """
     try:
-        trade_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=BOPGSTB"
-        gdp_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=GDP"
-        
-        trade_resp = requests.get(trade_url, headers=HEADERS, timeout=30)
-        gdp_resp = requests.get(gdp_url, headers=HEADERS, timeout=30)
+        # Year-ago ratio needs 15 monthly trade and 5 quarterly GDP observations
+        trade_resp, gdp_resp = fetch_fred_csvs("BOPGSTB", "GDP", years=3)
         
         if trade_resp.status_code == 200 and gdp_resp.status_code == 200:
-            def get_values(text):
-                lines = text.strip().split('\n')
-                values = []
-                for line in lines[1:]:
-                    parts = line.split(',')
-                    if len(parts) >= 2 and parts[1].strip() and parts[1] != '.':
-                        values.append((parts[0], float(parts[1])))
-                return values
-            
-            trade_vals = get_values(trade_resp.text)
-            gdp_vals = get_values(gdp_resp.text)
+            trade_vals = parse_fred_csv(trade_resp.text)
+            gdp_vals = parse_fred_csv(gdp_resp.text)
             
             if trade_vals and gdp_vals:
                 # Average last 3 months of trade data
@@ -675,7 +762,7 @@ def fetch_trade_balance_gdp():
                     "date": trade_date,
                     "data_freshness": trade_date,
                     "source": "FRED (BOPGSTB / GDP)",
-                    "year_ago": round(year_ago_ratio, 2) if year_ago_ratio else None,
+                    "year_ago": round_or_none(year_ago_ratio, 2),
                     "change_1y": round(ratio - year_ago_ratio, 2) if year_ago_ratio else None
                 }
         
@@ -683,37 +770,95 @@ def fetch_trade_balance_gdp():
     except Exception as e:
         return {"success": False, "error": str(e), "source": "FRED"}
 
+def cached_fetch(key, fetch):
+    """
+    Run a fetcher, reusing its last successful result from CACHE_DIR while it
+    is younger than CACHE_TTL[key]. Without CACHE_DIR this is just fetch().
+    Only successful results are cached, so failures are always retried.
+    """
+    if not CACHE_DIR:
+        return fetch()
+    
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_TTL.get(key, 0):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    result = fetch()
+    if result.get("success"):
+        # Written via a temp file so a partial write is never read back, and
+        # a cache that can't be written never costs a fetch that worked
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    return result
+
 # =============================================================================
 # ANALYSIS FUNCTIONS  
 # =============================================================================
 
+def _status_rule(t):
+    """
+    Build a value -> status function for one THRESHOLDS entry, with its
+    limits and comparison direction bound once instead of looked up per call.
+    """
+    warning, critical = t["warning"], t["critical"]
+    breaches = operator.lt if t["direction"] == "below" else operator.gt
+    
+    def rule(value):
+        if breaches(value, critical):
+            return "critical"
+        if breaches(value, warning):
+            return "warning"
+        return "stable"
+    
+    return rule
+
+
+_STATUS_RULES = {key: _status_rule(t) for key, t in THRESHOLDS.items()}
+
+
 def assess_status(value, threshold_key):
     """Determine if a value is stable, warning, or critical."""
     if value is None:
         return "unknown"
-    
-    t = THRESHOLDS[threshold_key]
-    
-    if t["direction"] == "below":
-        if value < t["critical"]:
-            return "critical"
-        elif value < t["warning"]:
-            return "warning"
-        else:
-            return "stable"
-    else:  # "above"
-        if value > t["critical"]:
-            return "critical"
-        elif value > t["warning"]:
-            return "warning"
-        else:
-            return "stable"
+    return _STATUS_RULES[threshold_key](value)
+
+
+def summarize_statuses(data):
+    """
+    Count indicator statuses in a single pass over the fetched data.
+    Returns (counts, known): counts per status, and how many indicators
+    have a known (non-unknown) status. The informational intl_vs_us entry
+    is excluded since it never triggers warnings.
+    """
+    counts = {"stable": 0, "warning": 0, "critical": 0, "unknown": 0}
+    known = 0
+    for key, entry in data.items():
+        if key == "intl_vs_us" or not isinstance(entry, dict) or "status" not in entry:
+            continue
+        status = entry["status"]
+        if entry.get("success", False) or status != "unknown":
+            counts[status] = counts.get(status, 0) + 1
+            if status != "unknown":
+                known += 1
+    return counts, known
 
 
 def format_change(value, unit="%"):
     """Format a change value with + or - sign."""
     if value is None:
         return "N/A"
+    if value == 0:
+        value = abs(value)  # show -0.0 from rounding as 0.0
     sign = "+" if value > 0 else ""
     return f"{sign}{value}{unit}"
 
@@ -729,649 +874,577 @@ def format_value(value, unit="", default="N/A"):
 # REPORT GENERATION
 # =============================================================================
 
-def generate_html_report(data):
-    """Generate the HTML email report."""
-    
-    today = datetime.now().strftime('%B %d, %Y')
-    
-    # Collect all statuses (only from successful fetches)
-    statuses = []
-    status_counts = {"stable": 0, "warning": 0, "critical": 0, "unknown": 0}
-    total_metrics = 8  # Updated count
-    
-    for key in data:
-        if isinstance(data[key], dict) and "status" in data[key]:
-            status = data[key].get("status", "unknown")
-            # Skip info-only metrics (intl_vs_us) from status counts
-            if key == "intl_vs_us":
-                continue
-            if data[key].get("success", False) or status != "unknown":
-                statuses.append(status)
-                status_counts[status] = status_counts.get(status, 0) + 1
-    
-    # Determine overall status and create summary
-    warning_count = status_counts.get("warning", 0)
-    critical_count = status_counts.get("critical", 0)
-    successful_count = len([s for s in statuses if s != "unknown"])
-    
-    # Overall status logic:
-    # Green: 0-1 warnings, 0 criticals
-    # Amber: 2+ warnings OR 1 critical
-    # Red: 3+ warnings OR 2+ criticals OR (1 critical + 2+ warnings)
-    if critical_count >= 2 or (critical_count >= 1 and warning_count >= 2) or warning_count >= 3:
-        overall_color = "#dc3545"  # Red
-        overall_summary = f"HIGH ALERT: {critical_count} critical, {warning_count} warning out of {successful_count} metrics"
-    elif critical_count >= 1 or warning_count >= 2:
-        overall_color = "#f39c12"  # Amber
-        if critical_count >= 1:
-            overall_summary = f"Elevated concern: {critical_count} critical, {warning_count} warning out of {successful_count} metrics"
-        else:
-            overall_summary = f"Elevated concern: {warning_count} warnings out of {successful_count} metrics"
-    elif warning_count == 1:
-        overall_color = "#27ae60"  # Green (1 warning is still green)
-        overall_summary = f"All {successful_count} metrics stable (1 warning)"
-    elif successful_count > 0:
-        overall_color = "#27ae60"  # Green
-        overall_summary = f"All {successful_count} metrics stable"
-    else:
-        overall_color = "#95a5a6"  # Gray
-        overall_summary = "Data unavailable"
-
-    html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{ 
+# Static stylesheet, kept out of the report f-string so it is built once at
+# import instead of being re-formatted (with every brace escaped) per call.
+_CSS = """
+        body { 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
             max-width: 700px; 
             margin: 0 auto; 
             padding: 20px; 
             color: #333;
             line-height: 1.5;
-        }}
-        h1 {{ 
+        }
+        h1 { 
             color: #1a1a1a; 
             border-bottom: 2px solid #ddd; 
             padding-bottom: 10px; 
-        }}
-        h2 {{ 
+        }
+        h2 { 
             color: #444; 
             margin-top: 30px;
             font-size: 18px;
-        }}
-        .overall-status {{ 
-            background: {overall_color}; 
+        }
+        .overall-status { 
             color: white; 
             padding: 15px; 
             border-radius: 6px; 
             margin: 20px 0;
             font-size: 16px;
-        }}
-        .overall-status strong {{
+        }
+        .overall-status strong {
             font-size: 18px;
-        }}
-        .indicator {{ 
+        }
+        .indicator { 
             background: #f8f9fa; 
             padding: 15px; 
             margin: 15px 0; 
             border-radius: 6px; 
             border-left: 4px solid #ddd; 
-        }}
-        .indicator.critical {{ border-left-color: #dc3545; }}
-        .indicator.warning {{ border-left-color: #f39c12; }}
-        .indicator.stable {{ border-left-color: #27ae60; }}
-        .indicator.info {{ border-left-color: #3498db; }}
-        .indicator.unknown {{ border-left-color: #95a5a6; }}
-        .indicator-title {{
+        }
+        .indicator.critical { border-left-color: #dc3545; }
+        .indicator.warning { border-left-color: #f39c12; }
+        .indicator.stable { border-left-color: #27ae60; }
+        .indicator.info { border-left-color: #3498db; }
+        .indicator.unknown { border-left-color: #95a5a6; }
+        .indicator-title {
             font-weight: bold;
             margin-bottom: 8px;
-        }}
-        .indicator-value {{
+        }
+        .indicator-value {
             font-size: 24px;
             font-weight: bold;
             margin: 10px 0;
-        }}
-        .indicator-details {{
+        }
+        .indicator-details {
             font-size: 14px;
             color: #555;
-        }}
-        .data-freshness {{
+        }
+        .data-freshness {
             font-size: 11px;
             color: #888;
             margin-top: 8px;
             font-style: italic;
-        }}
-        .threshold-note {{
+        }
+        .threshold-note {
             font-size: 12px;
             color: #777;
             margin-top: 10px;
             padding-top: 10px;
             border-top: 1px solid #eee;
-        }}
-        .status-label {{
+        }
+        .status-label {
             display: inline-block;
             padding: 2px 8px;
             border-radius: 3px;
             font-size: 12px;
             font-weight: bold;
             text-transform: uppercase;
-        }}
-        .status-critical {{ background: #dc3545; color: white; }}
-        .status-warning {{ background: #f39c12; color: white; }}
-        .status-stable {{ background: #27ae60; color: white; }}
-        .status-info {{ background: #3498db; color: white; }}
-        .status-unknown {{ background: #95a5a6; color: white; }}
-        table {{
+        }
+        .status-critical { background: #dc3545; color: white; }
+        .status-warning { background: #f39c12; color: white; }
+        .status-stable { background: #27ae60; color: white; }
+        .status-info { background: #3498db; color: white; }
+        .status-unknown { background: #95a5a6; color: white; }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 10px 0;
             font-size: 14px;
-        }}
-        td {{
+        }
+        td {
             padding: 5px 0;
-        }}
-        td:last-child {{
+        }
+        td:last-child {
             text-align: right;
-        }}
-        .footer {{ 
+        }
+        .footer { 
             margin-top: 40px; 
             padding-top: 20px; 
             border-top: 1px solid #ddd; 
             font-size: 12px; 
             color: #666; 
-        }}
-        .error-note {{
+        }
+        .error-note {
             font-size: 12px;
             color: #dc3545;
             margin-top: 5px;
-        }}
-    </style>
+        }
+"""
+
+
+# Static page head with the stylesheet inlined, built once at import
+_HTML_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>""" + _CSS + """    </style>
 </head>
-<body>
+"""
+
+_BANNER_TMPL = """<body>
     <h1>Bretton Woods Decay Report</h1>
     <p>Report Date: {today}</p>
     
-    <div class="overall-status">
+    <div class="overall-status" style="background: {overall_color};">
         <strong>Status:</strong> {overall_summary}
     </div>
 """
-    
-    # 1. USD Reserve Share
-    cofer = data.get("cofer", {})
-    status = cofer.get("status", "unknown")
-    
-    if cofer.get("success"):
-        value_display = f"{cofer.get('value')}%"
-        period_display = cofer.get('period', 'N/A')
-        change_1y = format_change(cofer.get('change_1y'), '%')
-        change_5y = format_change(cofer.get('change_5y'), '%')
-        freshness = cofer.get('data_freshness', 'Unknown')
-        source = cofer.get('source', 'IMF COFER')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        period_display = "N/A"
-        change_1y = "N/A"
-        change_5y = "N/A"
-        freshness = "Unknown"
-        source = cofer.get('source', 'IMF COFER')
-        error_note = f'<div class="error-note">Could not fetch data: {cofer.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            USD Share of Global Reserves
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>Period</td><td>{period_display}</td></tr>
-                <tr><td>1-year change</td><td>{change_1y}</td></tr>
-                <tr><td>5-year change</td><td>{change_5y}</td></tr>
-            </table>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Warning: below {THRESHOLDS['usd_reserve_share']['warning']}% | 
-            Critical: below {THRESHOLDS['usd_reserve_share']['critical']}%<br>
-            {THRESHOLDS['usd_reserve_share']['context']}
-        </div>
-    </div>
-"""
-    
-    # 2. China Treasury Holdings
-    china = data.get("china", {})
-    status = china.get("status", "unknown")
-    
-    if china.get("current") is not None:
-        value_display = f"${china.get('current')}B"
-        change_6mo = format_change(china.get('change_6mo'), 'B')
-        change_12mo = format_change(china.get('change_12mo'), 'B')
-        trend = 'Selling' if (china.get('change_12mo') or 0) < -10 else 'Accumulating' if (china.get('change_12mo') or 0) > 10 else 'Stable'
-        freshness = china.get('data_freshness', 'Unknown')
-        source = china.get('source', 'Treasury TIC')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        change_6mo = "N/A"
-        change_12mo = "N/A"
-        trend = "Unknown"
-        freshness = "Unknown"
-        source = "Treasury TIC"
-        error_note = f'<div class="error-note">Could not fetch data: {china.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            China Treasury Holdings
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>6-month change</td><td>{change_6mo}</td></tr>
-                <tr><td>12-month change</td><td>{change_12mo}</td></tr>
-            </table>
-            <p>Trend: {trend}</p>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Warning: below ${THRESHOLDS['china_treasury']['warning']}B | 
-            Critical: below ${THRESHOLDS['china_treasury']['critical']}B<br>
-            {THRESHOLDS['china_treasury']['context']}
-        </div>
-    </div>
+
+_MARKET_CONTEXT_HEADER = """
+    <h2>Market Context</h2>
+    <p style="font-size: 14px; color: #666; margin-bottom: 15px;">Informational metrics that provide context but don't trigger warnings.</p>
 """
-    
-    # 3. Japan Treasury Holdings
-    japan = data.get("japan", {})
-    status = japan.get("status", "unknown")
-    
-    if japan.get("current") is not None:
-        value_display = f"${japan.get('current')}B"
-        change_6mo = format_change(japan.get('change_6mo'), 'B')
-        change_12mo = format_change(japan.get('change_12mo'), 'B')
-        trend = 'Selling' if (japan.get('change_12mo') or 0) < -10 else 'Accumulating' if (japan.get('change_12mo') or 0) > 10 else 'Stable'
-        freshness = japan.get('data_freshness', 'Unknown')
-        source = japan.get('source', 'Treasury TIC')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        change_6mo = "N/A"
-        change_12mo = "N/A"
-        trend = "Unknown"
-        freshness = "Unknown"
-        source = "Treasury TIC"
-        error_note = f'<div class="error-note">Could not fetch data: {japan.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            Japan Treasury Holdings
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>6-month change</td><td>{change_6mo}</td></tr>
-                <tr><td>12-month change</td><td>{change_12mo}</td></tr>
-            </table>
-            <p>Trend: {trend}</p>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Warning: below ${THRESHOLDS['japan_treasury']['warning']}B | 
-            Critical: below ${THRESHOLDS['japan_treasury']['critical']}B<br>
-            {THRESHOLDS['japan_treasury']['context']}
-        </div>
+
+_DECISION_FRAMEWORK = """
+    <h2>Decision Framework</h2>
+    <div class="indicator stable">
+        <p><strong>What to do with this information:</strong></p>
+        <ul>
+            <li><strong>All stable:</strong> No action needed. Check back next quarter.</li>
+            <li><strong>1-2 warnings:</strong> Note it, but don't react to a single report. Watch for trends across multiple reports.</li>
+            <li><strong>Warnings for 2-3 consecutive reports:</strong> Consider gradually shifting from 65/35 to 50/50 domestic/international.</li>
+            <li><strong>Multiple critical signals:</strong> More aggressive rebalancing toward international may be warranted.</li>
+        </ul>
+        <p style="margin-top: 15px;">Remember: These are slow-moving structural indicators. Monetary system changes happen over decades, not months. The goal is to catch sustained trends, not react to noise.</p>
     </div>
 """
-    
-    # 4. DXY
-    dxy = data.get("dxy", {})
-    status = dxy.get("status", "unknown")
-    
-    if dxy.get("success"):
-        value_display = f"{dxy.get('value')}"
-        change_1y = format_change(dxy.get('change_1y'), '%')
-        change_3y = format_change(dxy.get('change_3y'), '%')
-        year_ago_display = f"{dxy.get('year_ago', 'N/A')} ({dxy.get('year_ago_date', 'N/A')})"
-        freshness = dxy.get('data_freshness', 'Unknown')
-        source = dxy.get('source', 'Yahoo Finance')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        change_1y = "N/A"
-        change_3y = "N/A"
-        year_ago_display = "N/A"
-        freshness = "Unknown"
-        source = dxy.get('source', 'Yahoo Finance')
-        error_note = f'<div class="error-note">Could not fetch data: {dxy.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            Dollar Index (DXY)
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>1-year ago</td><td>{year_ago_display}</td></tr>
-                <tr><td>1-year change</td><td>{change_1y}</td></tr>
-                <tr><td>3-year change</td><td>{change_3y}</td></tr>
-            </table>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Warning: below {THRESHOLDS['dxy']['warning']} | 
-            Critical: below {THRESHOLDS['dxy']['critical']}<br>
-            {THRESHOLDS['dxy']['context']}
-        </div>
+
+_FOOTER_TMPL = """
+    <div class="footer">
+        <p>Generated by freak_the_f***_out_and_sell_everything.py<br>
+        This is financial advice and you can hold me, Elliot Allen, legally culpable.<br>
+        Next scheduled report: {next_month_name} {next_year}</p>
     </div>
+</body>
+</html>
 """
-    
-    # 5. Debt to GDP
-    debt = data.get("debt_to_gdp", {})
-    status = debt.get("status", "unknown")
-    
-    if debt.get("success"):
-        value_display = f"{debt.get('value')}%"
-        date_display = debt.get('date', 'N/A')
-        freshness = debt.get('data_freshness', 'Unknown')
-        source = debt.get('source', 'FRED')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        date_display = "N/A"
-        freshness = "Unknown"
-        source = debt.get('source', 'FRED')
-        error_note = f'<div class="error-note">Could not fetch data: {debt.get("error", "Unknown error")}</div>'
-    
-    html += f"""
+
+
+# One block layout shared by every indicator; filled with str.format_map so
+# the markup is parsed once at import rather than per call site.
+_INDICATOR_TMPL = """
     <div class="indicator {status}">
         <div class="indicator-title">
-            US Debt-to-GDP Ratio
-            <span class="status-label status-{status}">{status.upper()}</span>
+            {title}
+            <span class="status-label status-{status}">{label}</span>
         </div>
         <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
+        <div class="indicator-details">{rows_html}{extra_html}
             {error_note}
         </div>
         <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
         <div class="threshold-note">
-            Warning: above {THRESHOLDS['debt_to_gdp']['warning']}% | 
-            Critical: above {THRESHOLDS['debt_to_gdp']['critical']}%<br>
-            {THRESHOLDS['debt_to_gdp']['context']}
+            {threshold_note}
         </div>
     </div>
 """
+
+
+def format_threshold_note(threshold_key, unit="", prefix="", comparison=None):
+    """Build the warning/critical line plus historical context for an indicator."""
+    t = THRESHOLDS[threshold_key]
+    comparison = comparison or t["direction"]
+    return (
+        f"Warning: {comparison} {prefix}{t['warning']}{unit} | \n"
+        f"            Critical: {comparison} {prefix}{t['critical']}{unit}<br>\n"
+        f"            {t['context']}"
+    )
+
+
+def format_error_note(entry):
+    """Error line shown under an indicator whose fetch failed."""
+    return f'<div class="error-note">Could not fetch data: {escape(str(entry.get("error", "Unknown error")))}</div>'
+
+
+def render_indicator(title, status, value_display, rows=(), extra_html="", error_note="",
+                     freshness="Unknown", source="", threshold_note="", label=None):
+    """
+    Render one indicator block from the shared template.
+    Plain-text fields (values, rows, freshness, source) come from remote APIs
+    and are escaped here; extra_html, error_note and threshold_note are markup.
+    """
+    rows_html = ""
+    if rows:
+        rows_html = "\n            <table>\n" + "".join(
+            f"                <tr><td>{escape(str(name))}</td><td>{escape(str(value))}</td></tr>\n"
+            for name, value in rows
+        ) + "            </table>"
+    if extra_html:
+        extra_html = f"\n            {extra_html}"
+    return _INDICATOR_TMPL.format_map({
+        "status": status,
+        "label": label or status.upper(),
+        "title": escape(title),
+        "value_display": escape(str(value_display)),
+        "rows_html": rows_html,
+        "extra_html": extra_html,
+        "error_note": error_note,
+        "freshness": escape(str(freshness)),
+        "source": escape(str(source)),
+        "threshold_note": threshold_note,
+    })
+
+
+def _billions(field):
+    """Row getter showing a dollar amount in billions."""
+    return lambda entry: f"${entry.get(field, 'N/A')}B"
+
+
+def _holder_trend(entry):
+    """Describe a holder's 12-month direction for the Treasury blocks."""
+    change_12mo = entry.get("change_12mo") or 0
+    return "Selling" if change_12mo < -10 else "Accumulating" if change_12mo > 10 else "Stable"
+
+
+def _performance_direction(entry):
+    """Which market has led over 3 years, for the international vs US block."""
+    diff_3y = entry.get("diff_3y", 0) or 0
+    return "International outperforming" if diff_3y > 0 else "US outperforming" if diff_3y < 0 else "Roughly even"
+
+
+# Report blocks for the assessed indicators, in report order. Each spec names
+# its data key, how to display the value and detail rows when the fetch
+# succeeded (every row shows N/A otherwise), and its fallback source.
+# "changes" rows are (label, field, unit) and shown signed via format_change,
+# after any free-form "rows".
+# Optional: "available" (default: entry["success"]), "extra" markup with one
+# {} slot filled by "extra_value" (or "Unknown"), and fixed "status"/"label".
+INDICATOR_SPECS = [
+    {
+        "key": "cofer",
+        "title": "USD Share of Global Reserves",
+        "value": lambda entry: f"{entry.get('value')}%",
+        "rows": [("Period", lambda entry: entry.get("period", "N/A"))],
+        "changes": [("1-year change", "change_1y", "%"), ("5-year change", "change_5y", "%")],
+        "source": "IMF COFER",
+        "threshold_note": format_threshold_note("usd_reserve_share", unit="%"),
+    },
+    *[
+        {
+            "key": key,
+            "title": title,
+            "available": lambda entry: entry.get("current") is not None,
+            "value": lambda entry: f"${entry.get('current')}B",
+            "changes": [("6-month change", "change_6mo", "B"), ("12-month change", "change_12mo", "B")],
+            "extra": "<p>Trend: {}</p>",
+            "extra_value": _holder_trend,
+            "source": "Treasury TIC",
+            "threshold_note": format_threshold_note(threshold_key, unit="B", prefix="$"),
+        }
+        for key, title, threshold_key in [
+            ("china", "China Treasury Holdings", "china_treasury"),
+            ("japan", "Japan Treasury Holdings", "japan_treasury"),
+        ]
+    ],
+    {
+        "key": "dxy",
+        "title": "Dollar Index (DXY)",
+        "value": lambda entry: f"{entry.get('value')}",
+        "rows": [("1-year ago", lambda entry: f"{entry.get('year_ago', 'N/A')} ({entry.get('year_ago_date', 'N/A')})")],
+        "changes": [("1-year change", "change_1y", "%"), ("3-year change", "change_3y", "%")],
+        "source": "Yahoo Finance",
+        "threshold_note": format_threshold_note("dxy"),
+    },
+    {
+        "key": "debt_to_gdp",
+        "title": "US Debt-to-GDP Ratio",
+        "value": lambda entry: f"{entry.get('value')}%",
+        "source": "FRED",
+        "threshold_note": format_threshold_note("debt_to_gdp", unit="%"),
+    },
+    {
+        "key": "interest_to_revenue",
+        "title": "Interest Payments as % of Revenue",
+        "value": lambda entry: f"{entry.get('value')}%",
+        "rows": [
+            ("Quarterly interest (SAAR)", _billions("interest")),
+            ("Quarterly revenue (SAAR)", _billions("revenue")),
+        ],
+        "changes": [("1-year change", "change_1y", "%")],
+        "source": "FRED",
+        "threshold_note": format_threshold_note("interest_to_revenue", unit="%"),
+    },
+    {
+        "key": "interest_to_defense",
+        "title": "Interest vs Defense Spending (Guns vs Debt)",
+        "value": lambda entry: f"{entry.get('value')}%",
+        "rows": [
+            ("Interest payments (SAAR)", _billions("interest")),
+            ("Defense spending (SAAR)", _billions("defense")),
+        ],
+        "changes": [("1-year change", "change_1y", "%")],
+        "source": "FRED",
+        "threshold_note": format_threshold_note("interest_to_defense", unit="%"),
+    },
+    {
+        "key": "trade_balance_gdp",
+        "title": "Trade Balance as % of GDP",
+        "value": lambda entry: f"{entry.get('value')}%",
+        "rows": [
+            ("Trade balance (annualized)", _billions("trade_balance")),
+            ("GDP", _billions("gdp")),
+        ],
+        "changes": [("1-year change", "change_1y", "%")],
+        "source": "FRED",
+        "threshold_note": format_threshold_note("trade_balance_gdp", unit="%", comparison="less negative than"),
+    },
+]
+
+# Informational blocks under "Market Context"; these never trigger warnings
+CONTEXT_SPECS = [
+    {
+        "key": "intl_vs_us",
+        "title": "International vs US Stocks (3-Year)",
+        "status": "info",
+        "label": "CONTEXT",
+        "value": lambda entry: format_change(entry.get("diff_3y"), "%"),
+        "changes": [
+            ("International 3yr return (VXUS)", "intl_return_3y", "%"),
+            ("US 3yr return (VTI)", "us_return_3y", "%"),
+            ("1-year difference", "diff_1y", "%"),
+        ],
+        "extra": (
+            "<p><strong>{}</strong></p>\n"
+            '            <p style="font-size: 12px; color: #666;">VXUS (Total International, ex-US) vs VTI (Total US Market). These are good proxies for FTIHX vs FXAIX.</p>'
+        ),
+        "extra_value": _performance_direction,
+        "source": "Yahoo Finance",
+        "threshold_note": "Positive = international outperforming. US has outperformed international for most of 2010-2024. Sustained reversal may signal dollar weakness or valuation normalization.",
+    },
+]
+
+
+def render_indicator_spec(spec, data):
+    """Render one INDICATOR_SPECS / CONTEXT_SPECS block from the fetched data."""
+    entry = data.get(spec["key"], {})
+    available = spec["available"](entry) if "available" in spec else entry.get("success")
+    extra = spec.get("extra", "")
     
-    # 6. Interest to Revenue
-    interest = data.get("interest_to_revenue", {})
-    status = interest.get("status", "unknown")
-    
-    if interest.get("success"):
-        value_display = f"{interest.get('value')}%"
-        date_display = interest.get('date', 'N/A')
-        interest_amt = f"${interest.get('interest', 'N/A')}B"
-        revenue_amt = f"${interest.get('revenue', 'N/A')}B"
-        change_1y = format_change(interest.get('change_1y'), '%') if interest.get('change_1y') else "N/A"
-        freshness = interest.get('data_freshness', 'Unknown')
-        source = interest.get('source', 'FRED')
+    if available:
+        value_display = spec["value"](entry)
+        rows = [(label, get(entry)) for label, get in spec.get("rows", ())]
+        rows += [(label, format_change(entry.get(field), unit)) for label, field, unit in spec.get("changes", ())]
+        extra_html = extra.format(spec["extra_value"](entry)) if extra else ""
+        freshness = entry.get("data_freshness", "Unknown")
         error_note = ""
     else:
         value_display = "N/A"
-        date_display = "N/A"
-        interest_amt = "N/A"
-        revenue_amt = "N/A"
-        change_1y = "N/A"
+        rows = [(label, "N/A") for label, *_ in (*spec.get("rows", ()), *spec.get("changes", ()))]
+        extra_html = extra.format("Unknown") if extra else ""
         freshness = "Unknown"
-        source = interest.get('source', 'FRED')
-        error_note = f'<div class="error-note">Could not fetch data: {interest.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            Interest Payments as % of Revenue
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>Quarterly interest (SAAR)</td><td>{interest_amt}</td></tr>
-                <tr><td>Quarterly revenue (SAAR)</td><td>{revenue_amt}</td></tr>
-                <tr><td>1-year change</td><td>{change_1y}</td></tr>
-            </table>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Warning: above {THRESHOLDS['interest_to_revenue']['warning']}% | 
-            Critical: above {THRESHOLDS['interest_to_revenue']['critical']}%<br>
-            {THRESHOLDS['interest_to_revenue']['context']}
-        </div>
-    </div>
-"""
-    
-    # 7. Interest to Defense (Guns vs Debt)
-    int_def = data.get("interest_to_defense", {})
-    status = int_def.get("status", "unknown")
+        error_note = format_error_note(entry)
     
-    if int_def.get("success"):
-        value_display = f"{int_def.get('value')}%"
-        date_display = int_def.get('date', 'N/A')
-        interest_amt = f"${int_def.get('interest', 'N/A')}B"
-        defense_amt = f"${int_def.get('defense', 'N/A')}B"
-        change_1y = format_change(int_def.get('change_1y'), '%') if int_def.get('change_1y') else "N/A"
-        freshness = int_def.get('data_freshness', 'Unknown')
-        source = int_def.get('source', 'FRED')
-        error_note = ""
+    return render_indicator(
+        spec["title"],
+        spec.get("status") or entry.get("status", "unknown"),
+        value_display,
+        rows=rows,
+        extra_html=extra_html,
+        error_note=error_note,
+        freshness=freshness,
+        source=entry.get("source", spec["source"]),
+        threshold_note=spec["threshold_note"],
+        label=spec.get("label")
+    )
+
+
+# Next scheduled report for each calendar month, as (year offset, month name).
+# Mirrors the quarterly cron in .github/workflows/empire_watch.yml.
+_NEXT_REPORT = [
+    (0, "April"), (0, "April"), (0, "April"),
+    (0, "July"), (0, "July"), (0, "July"),
+    (0, "October"), (0, "October"), (0, "October"),
+    (1, "January"), (1, "January"), (1, "January"),
+]
+
+# Overall banner colour and summary template for each alert level
+_OVERALL = {
+    "red": ("#dc3545", "HIGH ALERT: {c} critical, {w} warning out of {t} metrics"),
+    "amber_critical": ("#f39c12", "Elevated concern: {c} critical, {w} warning out of {t} metrics"),
+    "amber": ("#f39c12", "Elevated concern: {w} warnings out of {t} metrics"),
+    "green_warning": ("#27ae60", "All {t} metrics stable (1 warning)"),
+    "green": ("#27ae60", "All {t} metrics stable"),
+    "unavailable": ("#95a5a6", "Data unavailable"),
+}
+
+
+def overall_level(critical_count, warning_count, known_count):
+    """
+    Map status counts to an _OVERALL alert level.
+    Green: 0-1 warnings, 0 criticals
+    Amber: 2+ warnings OR 1 critical
+    Red: 3+ warnings OR 2+ criticals OR (1 critical + 2+ warnings)
+    """
+    if critical_count >= 2 or (critical_count >= 1 and warning_count >= 2) or warning_count >= 3:
+        return "red"
+    if critical_count >= 1:
+        return "amber_critical"
+    if warning_count >= 2:
+        return "amber"
+    if warning_count == 1:
+        return "green_warning"
+    return "green" if known_count > 0 else "unavailable"
+
+
+# Email subject headline for each severity, worst first
+_SUBJECT = {
+    "critical": "{c} CRITICAL",
+    "warning": "{w} Warning",
+    "stable": "All Stable",
+    "unknown": "Data Unavailable",
+}
+
+
+def email_subject(summary, now):
+    """Subject line from the same (counts, known) summary the report banner uses."""
+    status_counts, known = summary
+    if status_counts["critical"]:
+        severity = "critical"
+    elif status_counts["warning"]:
+        severity = "warning"
     else:
-        value_display = "N/A"
-        date_display = "N/A"
-        interest_amt = "N/A"
-        defense_amt = "N/A"
-        change_1y = "N/A"
-        freshness = "Unknown"
-        source = int_def.get('source', 'FRED')
-        error_note = f'<div class="error-note">Could not fetch data: {int_def.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            Interest vs Defense Spending (Guns vs Debt)
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>Interest payments (SAAR)</td><td>{interest_amt}</td></tr>
-                <tr><td>Defense spending (SAAR)</td><td>{defense_amt}</td></tr>
-                <tr><td>1-year change</td><td>{change_1y}</td></tr>
-            </table>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Warning: above {THRESHOLDS['interest_to_defense']['warning']}% | 
-            Critical: above {THRESHOLDS['interest_to_defense']['critical']}%<br>
-            {THRESHOLDS['interest_to_defense']['context']}
-        </div>
-    </div>
-"""
+        severity = "stable" if known else "unknown"
+    headline = _SUBJECT[severity].format(c=status_counts["critical"], w=status_counts["warning"])
+    return f"Bretton Woods Decay: {headline} - {now.strftime('%B %Y')}"
+
+
+def generate_html_report(data, summary=None, now=None):
+    """
+    Generate the HTML email report.
+    summary is the (counts, known) pair from summarize_statuses(); it is
+    computed here if the caller has not already done so. now is the run
+    timestamp, so the report date and next-report footer agree with main().
+    """
     
-    # 8. Trade Balance / GDP
-    trade = data.get("trade_balance_gdp", {})
-    status = trade.get("status", "unknown")
+    now = now or datetime.now()
+    today = now.strftime('%B %d, %Y')
     
-    if trade.get("success"):
-        value_display = f"{trade.get('value')}%"
-        date_display = trade.get('date', 'N/A')
-        trade_amt = f"${trade.get('trade_balance', 'N/A')}B"
-        gdp_amt = f"${trade.get('gdp', 'N/A')}B"
-        change_1y = format_change(trade.get('change_1y'), '%') if trade.get('change_1y') else "N/A"
-        freshness = trade.get('data_freshness', 'Unknown')
-        source = trade.get('source', 'FRED')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        date_display = "N/A"
-        trade_amt = "N/A"
-        gdp_amt = "N/A"
-        change_1y = "N/A"
-        freshness = "Unknown"
-        source = trade.get('source', 'FRED')
-        error_note = f'<div class="error-note">Could not fetch data: {trade.get("error", "Unknown error")}</div>'
+    status_counts, successful_count = summary or summarize_statuses(data)
+    warning_count = status_counts["warning"]
+    critical_count = status_counts["critical"]
     
-    html += f"""
-    <div class="indicator {status}">
-        <div class="indicator-title">
-            Trade Balance as % of GDP
-            <span class="status-label status-{status}">{status.upper()}</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>Trade balance (annualized)</td><td>{trade_amt}</td></tr>
-                <tr><td>GDP</td><td>{gdp_amt}</td></tr>
-                <tr><td>1-year change</td><td>{change_1y}</td></tr>
-            </table>
-            {error_note}
-        </div>
-        <div class="threshold-note">
-            Warning: less negative than {THRESHOLDS['trade_balance_gdp']['warning']}% | 
-            Critical: less negative than {THRESHOLDS['trade_balance_gdp']['critical']}%<br>
-            {THRESHOLDS['trade_balance_gdp']['context']}
-        </div>
-    </div>
-"""
+    level = overall_level(critical_count, warning_count, successful_count)
+    overall_color, summary_tmpl = _OVERALL[level]
+    overall_summary = summary_tmpl.format(c=critical_count, w=warning_count, t=successful_count)
 
-    # Market Context Section (Informational - Blue)
-    html += """
-    <h2>Market Context</h2>
-    <p style="font-size: 14px; color: #666; margin-bottom: 15px;">Informational metrics that provide context but don't trigger warnings.</p>
-"""
+    parts = [_HTML_HEAD, _BANNER_TMPL.format(today=today, overall_color=overall_color, overall_summary=overall_summary)]
     
-    # International vs US Performance (now informational/blue)
-    perf = data.get("intl_vs_us", {})
+    # Assessed indicators
+    parts.extend(render_indicator_spec(spec, data) for spec in INDICATOR_SPECS)
     
-    if perf.get("success"):
-        diff_3y = perf.get('diff_3y', 0) or 0
-        value_display = format_change(perf.get('diff_3y'), '%')
-        direction = "International outperforming" if diff_3y > 0 else "US outperforming" if diff_3y < 0 else "Roughly even"
-        intl_3y = format_change(perf.get('intl_return_3y'), '%')
-        us_3y = format_change(perf.get('us_return_3y'), '%')
-        diff_1y = format_change(perf.get('diff_1y'), '%')
-        freshness = perf.get('data_freshness', 'Unknown')
-        source = perf.get('source', 'Yahoo Finance')
-        error_note = ""
-    else:
-        value_display = "N/A"
-        direction = "Unknown"
-        intl_3y = "N/A"
-        us_3y = "N/A"
-        diff_1y = "N/A"
-        freshness = "Unknown"
-        source = perf.get('source', 'Yahoo Finance')
-        error_note = f'<div class="error-note">Could not fetch data: {perf.get("error", "Unknown error")}</div>'
-    
-    html += f"""
-    <div class="indicator info">
-        <div class="indicator-title">
-            International vs US Stocks (3-Year)
-            <span class="status-label status-info">CONTEXT</span>
-        </div>
-        <div class="indicator-value">{value_display}</div>
-        <div class="indicator-details">
-            <table>
-                <tr><td>International 3yr return (VXUS)</td><td>{intl_3y}</td></tr>
-                <tr><td>US 3yr return (VTI)</td><td>{us_3y}</td></tr>
-                <tr><td>1-year difference</td><td>{diff_1y}</td></tr>
-            </table>
-            <p><strong>{direction}</strong></p>
-            <p style="font-size: 12px; color: #666;">VXUS (Total International, ex-US) vs VTI (Total US Market). These are good proxies for FTIHX vs FXAIX.</p>
-            {error_note}
-        </div>
-        <div class="data-freshness">Data as of: {freshness} | Source: {source}</div>
-        <div class="threshold-note">
-            Positive = international outperforming. US has outperformed international for most of 2010-2024. Sustained reversal may signal dollar weakness or valuation normalization.
-        </div>
-    </div>
-"""
+    # Market Context Section (Informational - Blue)
+    parts.append(_MARKET_CONTEXT_HEADER)
+    parts.extend(render_indicator_spec(spec, data) for spec in CONTEXT_SPECS)
     
     # Decision Framework
-    html += """
-    <h2>Decision Framework</h2>
-    <div class="indicator stable">
-        <p><strong>What to do with this information:</strong></p>
-        <ul>
-            <li><strong>All stable:</strong> No action needed. Check back next quarter.</li>
-            <li><strong>1-2 warnings:</strong> Note it, but don't react to a single report. Watch for trends across multiple reports.</li>
-            <li><strong>Warnings for 2-3 consecutive reports:</strong> Consider gradually shifting from 65/35 to 50/50 domestic/international.</li>
-            <li><strong>Multiple critical signals:</strong> More aggressive rebalancing toward international may be warranted.</li>
-        </ul>
-        <p style="margin-top: 15px;">Remember: These are slow-moving structural indicators. Monetary system changes happen over decades, not months. The goal is to catch sustained trends, not react to noise.</p>
-    </div>
-"""
-    
-    # Footer - Calculate next report month
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    # Quarterly schedule: Jan, Apr, Jul, Oct
-    quarterly_months = [1, 4, 7, 10]
-    next_quarter_months = [m for m in quarterly_months if m > current_month]
-    
-    if next_quarter_months:
-        next_month_num = next_quarter_months[0]
-        next_year = current_year
-    else:
-        next_month_num = quarterly_months[0]  # January
-        next_year = current_year + 1
+    parts.append(_DECISION_FRAMEWORK)
     
-    next_month_name = datetime(2000, next_month_num, 1).strftime('%B')
+    # Footer - next scheduled report (quarterly: Jan, Apr, Jul, Oct)
+    year_offset, next_month_name = _NEXT_REPORT[now.month - 1]
+    parts.append(_FOOTER_TMPL.format(next_month_name=next_month_name, next_year=now.year + year_offset))
     
-    html += f"""
-    <div class="footer">
-        <p>Generated by freak_the_f***_out_and_sell_everything.py<br>
-        This is financial advice and you can hold me, Elliot Allen, legally culpable.<br>
-        Next scheduled report: {next_month_name} {next_year}</p>
+    return "".join(parts)
+
+
+# Minimal report used when every data source failed, so the full render is skipped
+_FALLBACK_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="UTF-8"></head>
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; max-width: 700px; margin: 0 auto; padding: 20px; color: #333;">
+    <h1>Bretton Woods Decay Report</h1>
+    <p>Report Date: {today}</p>
+    <div style="background: #95a5a6; color: white; padding: 15px; border-radius: 6px;">
+        <strong>Status:</strong> Data unavailable - all data sources failed
     </div>
+    <ul>
+{errors}
+    </ul>
 </body>
 </html>
 """
-    
-    return html
 
 
-def send_email_icloud(subject, body_html):
-    """Send email via iCloud SMTP."""
+def generate_fallback_report(data, now=None):
+    """Generate the short 'all sources failed' report listing each error."""
+    errors = "\n".join(
+        f"        <li>{escape(key)}: {escape(str(entry.get('error', 'Unknown error')))}</li>"
+        for key, entry in data.items()
+    )
+    today = (now or datetime.now()).strftime('%B %d, %Y')
+    return _FALLBACK_HTML.format(today=today, errors=errors)
+
+
+def save_report(html, path="bretton_woods_report.html"):
+    """
+    Write the report as UTF-8 bytes in a single write.
+    Goes through a temp file and os.replace so a crashed run never leaves a
+    truncated report behind for the workflow artifact upload.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(html.encode("utf-8"))
+    os.replace(tmp_path, path)
+
+
+def smtp_login():
+    """Open an authenticated STARTTLS connection to iCloud SMTP."""
+    server = smtplib.SMTP('smtp.mail.me.com', 587, timeout=30)
+    try:
+        server.starttls()
+        server.login(ICLOUD_EMAIL, ICLOUD_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def send_email_icloud(subject, body_html, attempts=3, server=None):
+    """
+    Send email via iCloud SMTP.
+    Pass a server from smtp_login() to send several messages over one
+    authenticated connection; the caller keeps ownership of it. Connections
+    opened here are always closed on the way out. If the server drops the
+    connection mid-send, log back in and retry with exponential backoff
+    rather than losing the quarter's report.
+    """
     if not ICLOUD_EMAIL or not ICLOUD_PASSWORD:
         print("Error: Email credentials not configured")
         return False
     
     recipient = TO_EMAIL or ICLOUD_EMAIL
     
-    msg = MIMEMultipart()
+    msg = EmailMessage()
     msg['From'] = f"Bretton Woods Decay <{ICLOUD_EMAIL}>"
     msg['To'] = recipient
     msg['Subject'] = subject
-    msg.attach(MIMEText(body_html, 'html'))
+    msg.set_content("This report is formatted as HTML; open it in an HTML-capable mail client.")
+    msg.add_alternative(body_html, subtype='html')
     
     try:
-        server = smtplib.SMTP('smtp.mail.me.com', 587)
-        server.starttls()
-        server.login(ICLOUD_EMAIL, ICLOUD_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        with ExitStack() as connections:
+            if server is None:
+                server = connections.enter_context(smtp_login())
+            for attempt in range(attempts):
+                try:
+                    server.send_message(msg)
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    if attempt == attempts - 1:
+                        raise
+                    time.sleep(0.3 * 2 ** attempt)
+                    server = connections.enter_context(smtp_login())
         print(f"Email sent successfully to {recipient}")
         return True
     except Exception as e:
@@ -1383,153 +1456,122 @@ def send_email_icloud(subject, body_html):
 # MAIN
 # =============================================================================
 
+# Indicators fetched by main(), in report order:
+# (data key, fetcher, THRESHOLDS key, progress label, result summary for the log)
+# Treasury holdings are split into separate china/japan entries after fetching.
+INDICATORS = [
+    ("cofer", fetch_imf_cofer, "usd_reserve_share",
+     "USD reserve share (IMF COFER via DBnomics)",
+     lambda r: f"Value: {r['value']}% ({r.get('period')})"),
+    ("treasury", fetch_treasury_holdings, None,
+     "Treasury holdings (TIC)",
+     None),
+    ("dxy", fetch_dxy, "dxy",
+     "Dollar Index (DXY)",
+     lambda r: f"Value: {r['value']}"),
+    ("debt_to_gdp", fetch_debt_to_gdp, "debt_to_gdp",
+     "Debt-to-GDP ratio (FRED)",
+     lambda r: f"Value: {r['value']}%"),
+    ("interest_to_revenue", fetch_interest_to_revenue, "interest_to_revenue",
+     "Interest/Revenue ratio (FRED - quarterly BEA data)",
+     lambda r: f"Value: {r['value']}%"),
+    ("interest_to_defense", fetch_interest_to_defense, "interest_to_defense",
+     "Interest/Defense ratio (FRED)",
+     lambda r: f"Value: {r['value']}%"),
+    ("trade_balance_gdp", fetch_trade_balance_gdp, "trade_balance_gdp",
+     "Trade Balance/GDP ratio (FRED)",
+     lambda r: f"Value: {r['value']}%"),
+    ("intl_vs_us", fetch_intl_vs_us_performance, None,
+     "International vs US performance (VXUS vs VTI)",
+     lambda r: f"3yr diff: {r.get('diff_3y')}%"),
+]
+
+
+def add_treasury_holders(data, treasury):
+    """Split the TIC result into assessed china/japan entries on data."""
+    if not treasury.get("success"):
+        print(f"  Failed: {treasury.get('error')}")
+        data["china"] = {"status": "unknown", "error": treasury.get("error")}
+        data["japan"] = {"status": "unknown", "error": treasury.get("error")}
+        return
+    
+    for key, name, threshold_key in [("china", "China", "china_treasury"), ("japan", "Japan", "japan_treasury")]:
+        if key in treasury:
+            holder = treasury[key]
+            holder["value"] = holder["current"]
+            holder["status"] = assess_status(holder["current"], threshold_key)
+            print(f"  {name}: ${holder['current']}B - Status: {holder['status']}")
+            data[key] = holder
+        else:
+            data[key] = {"status": "unknown", "error": f"{name} data not found in TIC report"}
+            print(f"  {name}: Not found")
+
+
 def main():
     print("=" * 60)
     print("Bretton Woods Decay - Quarterly Report")
     print("=" * 60)
-    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    now = datetime.now()
+    print(f"Date: {now.strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
     data = {}
     
-    # 1. IMF COFER
-    print("Fetching USD reserve share (IMF COFER via DBnomics)...")
-    cofer = fetch_imf_cofer()
-    if cofer.get("success"):
-        cofer["status"] = assess_status(cofer.get("value"), "usd_reserve_share")
-        print(f"  Value: {cofer['value']}% ({cofer.get('period')}) - Status: {cofer['status']}")
-    else:
-        cofer["status"] = "unknown"
-        print(f"  Failed: {cofer.get('error')}")
-    data["cofer"] = cofer
-    
-    # 2 & 3. Treasury Holdings
-    print("Fetching Treasury holdings (TIC)...")
-    treasury = fetch_treasury_holdings()
+    # Every fetch is an independent HTTP round-trip to a different host, so
+    # kick them all off at once and consume the results below in report order.
+    with ThreadPoolExecutor(max_workers=len(INDICATORS)) as executor:
+        futures = {key: executor.submit(cached_fetch, key, fetch) for key, fetch, _, _, _ in INDICATORS}
     
-    if treasury.get("success"):
-        if "china" in treasury:
-            china = treasury["china"]
-            china["value"] = china["current"]
-            china["status"] = assess_status(china["current"], "china_treasury")
-            print(f"  China: ${china['current']}B - Status: {china['status']}")
-            data["china"] = china
-        else:
-            data["china"] = {"status": "unknown", "error": "China data not found in TIC report"}
-            print("  China: Not found")
+    for key, _, threshold_key, label, describe in INDICATORS:
+        print(f"Fetching {label}...")
+        result = futures[key].result()
+        
+        if key == "treasury":
+            add_treasury_holders(data, result)
+            continue
         
-        if "japan" in treasury:
-            japan = treasury["japan"]
-            japan["value"] = japan["current"]
-            japan["status"] = assess_status(japan["current"], "japan_treasury")
-            print(f"  Japan: ${japan['current']}B - Status: {japan['status']}")
-            data["japan"] = japan
+        if result.get("success"):
+            # Informational metrics have no thresholds and are never assessed
+            result["status"] = assess_status(result.get("value"), threshold_key) if threshold_key else "info"
+            print(f"  {describe(result)} - Status: {result['status']}")
         else:
-            data["japan"] = {"status": "unknown", "error": "Japan data not found in TIC report"}
-            print("  Japan: Not found")
-    else:
-        print(f"  Failed: {treasury.get('error')}")
-        data["china"] = {"status": "unknown", "error": treasury.get("error")}
-        data["japan"] = {"status": "unknown", "error": treasury.get("error")}
-    
-    # 4. DXY
-    print("Fetching Dollar Index (DXY)...")
-    dxy = fetch_dxy()
-    if dxy.get("success"):
-        dxy["status"] = assess_status(dxy.get("value"), "dxy")
-        print(f"  Value: {dxy['value']} - Status: {dxy['status']}")
-    else:
-        dxy["status"] = "unknown"
-        print(f"  Failed: {dxy.get('error')}")
-    data["dxy"] = dxy
-    
-    # 5. Debt to GDP
-    print("Fetching Debt-to-GDP ratio (FRED)...")
-    debt = fetch_debt_to_gdp()
-    if debt.get("success"):
-        debt["status"] = assess_status(debt.get("value"), "debt_to_gdp")
-        print(f"  Value: {debt['value']}% - Status: {debt['status']}")
-    else:
-        debt["status"] = "unknown"
-        print(f"  Failed: {debt.get('error')}")
-    data["debt_to_gdp"] = debt
-    
-    # 6. Interest to Revenue (now quarterly)
-    print("Fetching Interest/Revenue ratio (FRED - quarterly BEA data)...")
-    interest = fetch_interest_to_revenue()
-    if interest.get("success"):
-        interest["status"] = assess_status(interest.get("value"), "interest_to_revenue")
-        print(f"  Value: {interest['value']}% - Status: {interest['status']}")
-    else:
-        interest["status"] = "unknown"
-        print(f"  Failed: {interest.get('error')}")
-    data["interest_to_revenue"] = interest
-    
-    # 7. Interest to Defense
-    print("Fetching Interest/Defense ratio (FRED)...")
-    int_def = fetch_interest_to_defense()
-    if int_def.get("success"):
-        int_def["status"] = assess_status(int_def.get("value"), "interest_to_defense")
-        print(f"  Value: {int_def['value']}% - Status: {int_def['status']}")
-    else:
-        int_def["status"] = "unknown"
-        print(f"  Failed: {int_def.get('error')}")
-    data["interest_to_defense"] = int_def
-    
-    # 8. Trade Balance / GDP
-    print("Fetching Trade Balance/GDP ratio (FRED)...")
-    trade = fetch_trade_balance_gdp()
-    if trade.get("success"):
-        trade["status"] = assess_status(trade.get("value"), "trade_balance_gdp")
-        print(f"  Value: {trade['value']}% - Status: {trade['status']}")
-    else:
-        trade["status"] = "unknown"
-        print(f"  Failed: {trade.get('error')}")
-    data["trade_balance_gdp"] = trade
-    
-    # 10. International vs US Performance (informational only)
-    print("Fetching International vs US performance (VXUS vs VTI)...")
-    perf = fetch_intl_vs_us_performance()
-    if perf.get("success"):
-        perf["status"] = "info"  # Always info, not assessed
-        print(f"  3yr diff: {perf.get('diff_3y')}% - Status: {perf['status']}")
-    else:
-        perf["status"] = "unknown"
-        print(f"  Failed: {perf.get('error')}")
-    data["intl_vs_us"] = perf
+            result["status"] = "unknown"
+            print(f"  Failed: {result.get('error')}")
+        data[key] = result
 
-    # Generate report
-    print()
-    print("Generating report...")
-    html = generate_html_report(data)
-    
-    # Save locally
-    with open("bretton_woods_report.html", "w") as f:
-        f.write(html)
-    print("Saved to bretton_woods_report.html")
-    
-    # Determine subject based on known statuses only
-    statuses = []
-    for d in data.values():
-        if isinstance(d, dict) and d.get("success", False):
-            statuses.append(d.get("status", "unknown"))
-    
-    warning_count = statuses.count("warning")
-    critical_count = statuses.count("critical")
+    # The SMTP connect/STARTTLS/login handshake doesn't depend on the report,
+    # so run it in the background while the report is rendered and saved.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        login = executor.submit(smtp_login) if ICLOUD_EMAIL and ICLOUD_PASSWORD else None
+        
+        # Generate report
+        print()
+        print("Generating report...")
+        summary = summarize_statuses(data)
+        _, known = summary
+        if known == 0 and not any(entry.get("success") for entry in data.values()):
+            html = generate_fallback_report(data, now)
+        else:
+            html = generate_html_report(data, summary, now)
+        
+        # Save locally
+        save_report(html)
+        print("Saved to bretton_woods_report.html")
     
-    if critical_count > 0:
-        subject = f"Bretton Woods Decay: {critical_count} CRITICAL - {datetime.now().strftime('%B %Y')}"
-    elif warning_count > 0:
-        subject = f"Bretton Woods Decay: {warning_count} Warning - {datetime.now().strftime('%B %Y')}"
-    elif statuses:
-        subject = f"Bretton Woods Decay: All Stable - {datetime.now().strftime('%B %Y')}"
-    else:
-        subject = f"Bretton Woods Decay: Data Unavailable - {datetime.now().strftime('%B %Y')}"
+    subject = email_subject(summary, now)
     
     # Send email
     print()
     print("Sending email...")
-    if send_email_icloud(subject, html):
+    try:
+        server = login.result() if login else None
+    except Exception:
+        server = None  # send_email_icloud logs in again and reports the error
+    with ExitStack() as connections:
+        if server is not None:
+            connections.enter_context(server)
+        sent = send_email_icloud(subject, html, server=server)
+    if sent:
         print("Done!")
     else:
         print("Email failed - check bretton_woods_report.html for report")